@@ -27,13 +27,28 @@ Environment Variables (see .env.example):
 """
 
 import os
+import re
+import bisect
+import asyncio
+import calendar
+import itertools
 import time
 import logging
+import threading
+import httpx
+import orjson
+import redis
 import requests
-import random
-from datetime import datetime
+import secrets
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple, Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ─────────────────────────────────────────────────────────────────────────────
 # SignalWire Agents SDK imports
@@ -52,32 +67,275 @@ logger = logging.getLogger(__name__)
 # ─────────────────────────────────────────────────────────────────────────────
 # Global State
 # ─────────────────────────────────────────────────────────────────────────────
-# This dict stores the SWML handler info after registration on startup.
+@dataclass(slots=True)
+class HandlerInfo:
+    """SWML handler details resolved at startup."""
+    id: Optional[str] = None          # Handler resource ID
+    address_id: Optional[str] = None  # Address resource ID (used to scope tokens)
+    address: Optional[str] = None     # The SIP address clients dial to reach the agent
+
+
+# This stores the SWML handler info after registration on startup.
 # It's used by the /get_token endpoint to provide the call address to clients.
-swml_handler_info = {
-    "id": None,           # Handler resource ID
-    "address_id": None,   # Address resource ID (used to scope tokens)
-    "address": None       # The SIP address clients dial to reach the agent
-}
+# Writers build a new HandlerInfo and swap it in under _handler_lock; readers
+# take a local reference and always see a consistent snapshot.
+swml_handler_info = HandlerInfo()
+_handler_lock = threading.Lock()
+
+
+def _set_handler_info(info: HandlerInfo):
+    """Atomically replace the published SWML handler info."""
+    global swml_handler_info
+    with _handler_lock:
+        swml_handler_info = info
+
+
+# Guest token shared by /get_token callers until it nears expiry. Replaced as
+# a whole (never mutated) so readers always see a matching token/expiry pair.
+# _token_lock ensures only one request refreshes it at a time; it is an
+# asyncio lock because /get_token awaits the SignalWire API while holding it.
+_TOKEN_CACHE = {"token": None, "expires": 0, "address_id": None}
+_token_lock = asyncio.Lock()
+_TOKEN_REFRESH_MARGIN = 3600  # seconds before expiry to fetch a new token
+
+
+def _cached_guest_token(address_id):
+    """Return the cached guest token if it is scoped to address_id and still fresh."""
+    cached = _TOKEN_CACHE
+    if (cached["token"] and cached["address_id"] == address_id
+            and time.time() < cached["expires"] - _TOKEN_REFRESH_MARGIN):
+        return cached["token"]
+    return None
+
+
+def _store_guest_token(token, expires, address_id):
+    """Publish a newly issued guest token."""
+    global _TOKEN_CACHE
+    _TOKEN_CACHE = {"token": token, "expires": expires, "address_id": address_id}
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Reservation Data Structures (In-Memory)
 # ─────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Reservation:
+    """A booked table. Serialized with asdict() at the API/event boundary."""
+    id: str
+    name: str
+    party_size: int
+    date: str          # YYYY-MM-DD
+    time: str          # 24-hour format, one of TIME_SLOTS
+    phone: str
+    special_requests: str = ""
+    created_at: str = ""
+    status: str = "confirmed"
+
+
 # Stores all reservations keyed by reservation ID
 RESERVATIONS = {}
 
-# Tracks availability per date and time slot
+# Live view of RESERVATIONS holding only confirmed (not cancelled) entries
+CONFIRMED_RESERVATIONS = {}
+
+# Lookup indexes over confirmed reservations: digits-only phone / lowercased
+# name -> {IDs}. RES_BY_PHONE_SUFFIX is keyed on the last four phone digits,
+# which is how callers usually identify themselves.
+RES_BY_PHONE = defaultdict(set)
+RES_BY_PHONE_SUFFIX = defaultdict(set)
+RES_BY_NAME_LOWER = defaultdict(set)
+
+# Confirmed reservations per date, each list kept sorted by time
+RES_BY_DATE = {}
+
+# Tracks booked counts per date: {date: [booked, ...]} indexed by SLOT_INDEX
 AVAILABILITY = {}
 
+# Reverse map of reservation ID -> (date, slot index) for O(1) release
+RES_TO_SLOT = {}
+
+# Per-date locks serializing book/release on the same date (stripe locking);
+# _DATE_LOCKS_META only guards creation of new locks
+_DATE_LOCKS = {}
+_DATE_LOCKS_META = threading.Lock()
+
 # Configuration
 TIME_SLOTS = ["17:00", "18:00", "19:00", "20:00", "21:00"]  # 5pm-9pm
+TIME_SLOTS_SET = frozenset(TIME_SLOTS)  # For O(1) validation of incoming times
 MAX_PER_SLOT = 5  # Maximum reservations per time slot
 MAX_PARTY_SIZE = 20
 
+# /api/availability payload for a date with no bookings. Shared and read-only;
+# FastAPI only reads it when serializing the response.
+DEFAULT_AVAILABILITY = {slot: {"available": MAX_PER_SLOT, "total": MAX_PER_SLOT} for slot in TIME_SLOTS}
+
+# Precomputed display strings for the (fixed) slot list
+_TIME_SLOTS_DISPLAY = ", ".join(TIME_SLOTS)
+_TIME_SLOTS_PROMPT = (
+    f"Available time slots are: {_TIME_SLOTS_DISPLAY} (5 PM to 9 PM). "
+    f"Maximum party size is {MAX_PARTY_SIZE}."
+)
+
+# Position of each time slot within a date's AVAILABILITY row
+SLOT_INDEX = {slot: i for i, slot in enumerate(TIME_SLOTS)}
+
+# Optional shared availability store. When REDIS_URL is set (e.g. the Dokku
+# redis service is linked), slot counts live in Redis so workers can't
+# overbook a slot between them. Otherwise they stay in the in-process
+# AVAILABILITY. Reservation records and RES_TO_SLOT are always per-process:
+# a booking can only be looked up, modified, or cancelled on the worker that
+# made it, and a restart loses them while their Redis counts remain. Each
+# date's counts therefore expire at the end of the day after the date, so
+# seats orphaned by a restart are reclaimed at the latest by then.
+REDIS_URL = os.getenv("REDIS_URL", "")
+# SWAIG handlers run on the event-loop thread, so every Redis call blocks the
+# loop for its round trip; the socket timeouts cap how long a stalled Redis
+# can hold it.
+_REDIS = redis.Redis.from_url(
+    REDIS_URL, socket_timeout=1, socket_connect_timeout=1
+) if REDIS_URL else None
+_REDIS_KEY_PREFIX = f"availability:{os.getenv('AGENT_NAME', 'bobbystable')}"
+
+# Minimum lifetime of a slot count, and the expiry used when its date isn't
+# YYYY-MM-DD. Without the floor, counts for past dates would expire as soon
+# as they were written and those slots could be booked without limit.
+_REDIS_FALLBACK_TTL = 7 * 86400  # seconds
+
+# Take a seat only if the slot is below capacity (ARGV[1]) and (re)set the
+# count's expiry to ARGV[2] (Unix time); returns 1 or 0
+_BOOK_SCRIPT = _REDIS.register_script(
+    "local v = redis.call('INCR', KEYS[1]) "
+    "if tonumber(v) > tonumber(ARGV[1]) then redis.call('DECR', KEYS[1]) return 0 end "
+    "redis.call('EXPIREAT', KEYS[1], ARGV[2]) "
+    "return 1"
+) if _REDIS else None
+
+# Give a seat back, deleting the count once it reaches zero so no key is
+# ever left without an expiry
+_RELEASE_SCRIPT = _REDIS.register_script(
+    "local v = redis.call('DECR', KEYS[1]) "
+    "if v <= 0 then redis.call('DEL', KEYS[1]) end "
+    "return 1"
+) if _REDIS else None
+
+# Prebuilt /api/availability payloads: {date: (generation, row, payload)}.
+# Every booking or release on a date gives it a new generation from
+# _AVAIL_GEN_SEQ. An entry is only reused while the date's generation is
+# unchanged and _booked_row still returns the same row object (Redis rows are
+# refreshed from other workers' bookings), so a payload built concurrently
+# with a booking is never served afterwards.
+_AVAIL_CACHE = {}
+_AVAIL_GEN = {}
+_AVAIL_GEN_SEQ = itertools.count(1)
+
+# Short-lived per-worker LRU cache of Redis rows: {date: (expires_at, row)}.
+# Dates with no bookings are cached too (row None), so per-slot checks on an
+# empty date cost one MGET; the size cap keeps arbitrary dates requested from
+# /api/availability from growing it, and expired entries are dropped on read.
+# Local bookings invalidate their date immediately.
+_ROW_CACHE = OrderedDict()
+_ROW_CACHE_LOCK = threading.Lock()
+_ROW_CACHE_TTL = 2  # seconds
+_ROW_CACHE_MAX = 1024  # dates
+
+# UTC timestamp format for Reservation.created_at
+_ISO_UTC = "%Y-%m-%dT%H:%M:%SZ"
+
+# Spoken words for digits 0-9, indexed by digit value
+_DIGIT_WORDS = ('zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine')
+
+
+# Pre-generated confirmation numbers, refilled in batches when exhausted.
+# Drawn from the OS RNG so numbers can't be predicted from earlier ones.
+_CONF_POOL = []
+_CONF_RNG = secrets.SystemRandom()
+
+
+def _refill_pool(n=4096):
+    """Refill the confirmation number pool with a batch of unique 6-digit strings."""
+    _CONF_POOL.extend(map(str, _CONF_RNG.sample(range(100000, 1000000), n)))
+
 
 def generate_confirmation_number():
     """Generate a unique 6-digit confirmation number."""
-    return str(random.randint(100000, 999999))
+    while True:
+        if not _CONF_POOL:
+            _refill_pool()
+        number = _CONF_POOL.pop()
+        if number not in RESERVATIONS:
+            return number
+
+
+def _phone_digits(phone: str) -> str:
+    """Strip a phone number down to its digits."""
+    return "".join(filter(str.isdigit, phone))
+
+
+def _index_reservation(res: Reservation):
+    """Add a confirmed reservation to the phone, name, and date indexes."""
+    digits = _phone_digits(res.phone)
+    if digits:
+        RES_BY_PHONE[digits].add(res.id)
+        RES_BY_PHONE_SUFFIX[digits[-4:]].add(res.id)
+    RES_BY_NAME_LOWER[res.name.lower()].add(res.id)
+    bisect.insort(RES_BY_DATE.setdefault(res.date, []), res, key=lambda r: r.time)
+
+
+def _unindex_reservation(res: Reservation):
+    """Remove a reservation from the indexes, dropping empty buckets."""
+    digits = _phone_digits(res.phone)
+    for index, key in (
+        (RES_BY_PHONE, digits),
+        (RES_BY_PHONE_SUFFIX, digits[-4:]),
+        (RES_BY_NAME_LOWER, res.name.lower())
+    ):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(res.id)
+            if not bucket:
+                del index[key]
+
+    day = RES_BY_DATE.get(res.date)
+    if day is not None and res in day:
+        day.remove(res)
+        if not day:
+            del RES_BY_DATE[res.date]
+
+
+def find_reservations(phone: str = "", name: str = "") -> list:
+    """Find confirmed reservations by trailing phone digits or name (substring, case-insensitive).
+
+    Phones are compared by digits only and match when the stored number ends
+    with the query, so "4567", "555-123-4567" and "+1 555 123 4567" all find
+    +15551234567; digits from the middle of a number don't match. Every
+    reservation ending that way is returned, even when one matches exactly,
+    so the caller can ask for more detail instead of picking one. Queries of
+    four or more digits are a single probe of the last-four index plus a
+    check of that (small) bucket; shorter ones scan the distinct indexed
+    phones. Names scan the distinct indexed names.
+    """
+    ids = set()
+    digits = _phone_digits(phone)
+    if len(digits) >= 4:
+        bucket = RES_BY_PHONE_SUFFIX.get(digits[-4:], ())
+        if len(digits) == 4:
+            ids |= bucket
+        else:
+            for res_id in bucket:
+                res = CONFIRMED_RESERVATIONS.get(res_id)
+                if res is not None and _phone_digits(res.phone).endswith(digits):
+                    ids.add(res_id)
+    elif digits:
+        for key, bucket in RES_BY_PHONE.items():
+            if key.endswith(digits):
+                ids |= bucket
+    if name:
+        name_lower = name.lower()
+        for key, bucket in RES_BY_NAME_LOWER.items():
+            if name_lower in key:
+                ids |= bucket
+    # Skip IDs a concurrent cancel has already removed from the live view
+    matches = [res for res in map(CONFIRMED_RESERVATIONS.get, ids) if res is not None]
+    matches.sort(key=lambda r: (r.date, r.time))
+    return matches
 
 
 def say_digits(number_str: str) -> str:
@@ -85,51 +343,156 @@ def say_digits(number_str: str) -> str:
 
     Example: "123456" -> "one two three four five six"
     """
-    digit_words = {
-        '0': 'zero', '1': 'one', '2': 'two', '3': 'three', '4': 'four',
-        '5': 'five', '6': 'six', '7': 'seven', '8': 'eight', '9': 'nine'
-    }
-    return ' '.join(digit_words.get(d, d) for d in number_str)
+    if number_str.isascii() and number_str.isdigit():
+        return ' '.join(map(_DIGIT_WORDS.__getitem__, map(int, number_str)))
+    return ' '.join(_DIGIT_WORDS[ord(d) - 48] if '0' <= d <= '9' else d for d in number_str)
+
+
+def _redis_key(date: str, time_slot: str) -> str:
+    """Redis key holding the booked count for one date and time slot."""
+    return f"{_REDIS_KEY_PREFIX}:{date}:{time_slot}"
 
 
-def get_slot_availability(date: str, time_slot: str) -> dict:
+def _redis_expiry(date: str) -> int:
+    """Unix time at which a date's Redis slot counts expire.
+
+    That's the end of the following day (UTC), but never sooner than
+    _REDIS_FALLBACK_TTL from now.
+    """
+    floor = int(time.time()) + _REDIS_FALLBACK_TTL
+    try:
+        return max(calendar.timegm(time.strptime(date, "%Y-%m-%d")) + 2 * 86400, floor)
+    except ValueError:
+        return floor
+
+
+def _booked_row(date: str):
+    """Return a date's booked counts indexed by SLOT_INDEX, or None if nothing is booked."""
+    if _REDIS is None:
+        return AVAILABILITY.get(date)
+
+    now = time.monotonic()
+    with _ROW_CACHE_LOCK:
+        cached = _ROW_CACHE.get(date)
+        if cached is not None:
+            if cached[0] > now:
+                _ROW_CACHE.move_to_end(date)
+                return cached[1]
+            del _ROW_CACHE[date]
+
+    values = _REDIS.mget([_redis_key(date, slot) for slot in TIME_SLOTS])
+    row = [int(v or 0) for v in values] if any(values) else None
+    with _ROW_CACHE_LOCK:
+        _ROW_CACHE[date] = (now + _ROW_CACHE_TTL, row)
+        _ROW_CACHE.move_to_end(date)
+        if len(_ROW_CACHE) > _ROW_CACHE_MAX:
+            _ROW_CACHE.popitem(last=False)
+    return row
+
+
+class SlotStatus(NamedTuple):
+    """Result of an availability check for one date and time slot."""
+    available: bool
+    remaining: int
+    reason: Optional[str]
+
+
+# Every possible SlotStatus, built once. A slot's result depends only on its
+# booked count, so lookups are memoized by count and never go stale.
+_INVALID_SLOT = SlotStatus(False, 0, "Invalid time slot")
+_SLOT_STATUS = tuple(
+    SlotStatus(remaining > 0, remaining, None if remaining > 0 else "Time slot is fully booked")
+    for remaining in range(MAX_PER_SLOT + 1)
+)
+
+
+def get_slot_availability(date: str, time_slot: str) -> SlotStatus:
     """Check availability for a specific date and time slot."""
-    if date not in AVAILABILITY:
-        AVAILABILITY[date] = {
-            slot: {"max": MAX_PER_SLOT, "booked": 0, "reservation_ids": []}
-            for slot in TIME_SLOTS
-        }
+    i = SLOT_INDEX.get(time_slot)
+    if i is None:
+        return _INVALID_SLOT
 
-    slot = AVAILABILITY[date].get(time_slot)
-    if not slot:
-        return {"available": False, "remaining": 0, "reason": "Invalid time slot"}
+    # Dates without bookings have no row yet; don't create one just to read it
+    row = _booked_row(date)
+    if not row:
+        return _SLOT_STATUS[MAX_PER_SLOT]
+    return _SLOT_STATUS[max(0, MAX_PER_SLOT - row[i])]
 
-    remaining = slot["max"] - slot["booked"]
-    return {
-        "available": remaining > 0,
-        "remaining": remaining,
-        "reason": None if remaining > 0 else "Time slot is fully booked"
-    }
+
+def _slot_has_room(date: str, time_slot: str) -> bool:
+    """Fast check that a valid time slot on a date still has room."""
+    row = _booked_row(date)
+    return row is None or row[SLOT_INDEX[time_slot]] < MAX_PER_SLOT
+
+
+def _invalidate_date(date: str):
+    """Start a new cache generation for a date after its booked counts change."""
+    _AVAIL_GEN[date] = next(_AVAIL_GEN_SEQ)
+    if _REDIS is not None:
+        with _ROW_CACHE_LOCK:
+            _ROW_CACHE.pop(date, None)
+    _AVAIL_CACHE.pop(date, None)
+
+
+def _lock_for(date: str) -> threading.Lock:
+    """Return the lock guarding a date's availability row, creating it if needed."""
+    with _DATE_LOCKS_META:
+        return _DATE_LOCKS.setdefault(date, threading.Lock())
 
 
 def book_slot(date: str, time_slot: str, reservation_id: str) -> bool:
-    """Book a time slot for a reservation."""
-    avail = get_slot_availability(date, time_slot)
-    if not avail["available"]:
+    """Book a time slot for a reservation.
+
+    The capacity check and increment are atomic (a Lua script in Redis, or
+    the date's lock in memory), so two concurrent callers cannot both take
+    the last seat.
+    """
+    i = SLOT_INDEX.get(time_slot)
+    if i is None:
         return False
 
-    AVAILABILITY[date][time_slot]["booked"] += 1
-    AVAILABILITY[date][time_slot]["reservation_ids"].append(reservation_id)
+    if _REDIS is not None:
+        if not _BOOK_SCRIPT(keys=[_redis_key(date, time_slot)], args=[MAX_PER_SLOT, _redis_expiry(date)]):
+            return False
+        _invalidate_date(date)
+        RES_TO_SLOT[reservation_id] = (date, i)
+        return True
+
+    with _lock_for(date):
+        row = AVAILABILITY.setdefault(date, [0] * len(TIME_SLOTS))
+        if row[i] >= MAX_PER_SLOT:
+            return False
+        row[i] += 1
+        RES_TO_SLOT[reservation_id] = (date, i)
+        _invalidate_date(date)
     return True
 
 
-def release_slot(date: str, time_slot: str, reservation_id: str):
-    """Release a booked time slot."""
-    if date in AVAILABILITY and time_slot in AVAILABILITY[date]:
-        slot = AVAILABILITY[date][time_slot]
-        if reservation_id in slot["reservation_ids"]:
-            slot["reservation_ids"].remove(reservation_id)
-            slot["booked"] = max(0, slot["booked"] - 1)
+def _return_seat(date: str, i: int):
+    """Give back one seat in the date's slot at SLOT_INDEX position i."""
+    if _REDIS is not None:
+        _RELEASE_SCRIPT(keys=[_redis_key(date, TIME_SLOTS[i])])
+        _invalidate_date(date)
+        return
+
+    with _lock_for(date):
+        row = AVAILABILITY[date]
+        row[i] = max(0, row[i] - 1)
+        _invalidate_date(date)
+
+
+def release_slot(reservation_id: str):
+    """Release the time slot booked by a reservation."""
+    # pop() is atomic, so concurrent releases give the seat back only once
+    booked = RES_TO_SLOT.pop(reservation_id, None)
+    if booked is None:
+        return
+    try:
+        _return_seat(*booked)
+    except Exception:
+        # Keep the booking on record so the release can be retried
+        RES_TO_SLOT[reservation_id] = booked
+        raise
 
 # Server configuration
 HOST = "0.0.0.0"
@@ -147,6 +510,35 @@ PORT = int(os.environ.get('PORT', 5000))
 # - For local dev: Set SWML_PROXY_URL_BASE to your ngrok/tunnel URL
 # - The SDK's get_full_url() also auto-detects from X-Forwarded headers at runtime
 
+# Default headers for SignalWire API calls (JSON in, JSON out). Bodies are
+# encoded and decoded with orjson, so the Content-Type is set here rather
+# than by requests' json= argument.
+_SW_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+# Shared HTTP session for SignalWire API calls made during startup
+# registration, so connections and TLS sessions are pooled and reused.
+# Idempotent requests are retried on transient gateway errors.
+_SW_SESSION = requests.Session()
+_SW_SESSION.headers.update(_SW_HEADERS)
+_SW_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
+# Timeout (seconds) applied to every SignalWire API call
+_SW_TIMEOUT = 5
+
+# Async client for /get_token, so token requests wait on the event loop
+# instead of holding a worker thread. Closed on app shutdown.
+_HTTPX = httpx.AsyncClient(
+    headers=_SW_HEADERS,
+    timeout=_SW_TIMEOUT,
+    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+)
+
+
+@lru_cache(maxsize=1)
 def get_signalwire_host():
     """
     Get the full SignalWire API host from the space name.
@@ -154,6 +546,8 @@ def get_signalwire_host():
     The space name can be provided as either:
     - Just the space: "myspace" -> "myspace.signalwire.com"
     - Full domain: "myspace.signalwire.com" -> used as-is
+
+    The result is cached; environment variables are read once per process.
     """
     space = os.getenv("SIGNALWIRE_SPACE_NAME", "")
     if not space:
@@ -163,6 +557,23 @@ def get_signalwire_host():
     return f"{space}.signalwire.com"
 
 
+# SignalWire credentials, read once at import (environment variables don't
+# change mid-process). _SW_AUTH is None unless all three are configured.
+_SW_HOST = get_signalwire_host()
+_SW_PROJECT = os.getenv("SIGNALWIRE_PROJECT_ID", "")
+_SW_TOKEN = os.getenv("SIGNALWIRE_TOKEN", "")
+_SW_AUTH = (_SW_PROJECT, _SW_TOKEN) if _SW_HOST and _SW_PROJECT and _SW_TOKEN else None
+
+# Error responses returned by /get_token
+_ERR_NO_CREDENTIALS = ({"error": "SignalWire credentials not configured"}, 500)
+_ERR_NO_HANDLER = ({"error": "SWML handler not configured yet"}, 500)
+
+
+# SIP addresses start with /public/ and have no digits in the first three
+# characters of their final path segment (phone number addresses do)
+_SIP_ADDRESS_RE = re.compile(r"^/public/(?:.*/)?(?![^/]{0,2}\d)[^/]*$")
+
+
 def find_resource_address(addresses, agent_name):
     """
     Find the resource address matching /public/{agent_name} from a list of addresses.
@@ -171,22 +582,36 @@ def find_resource_address(addresses, agent_name):
     We want the resource address (e.g., /public/bobbystable) not the phone number address.
     """
     expected_address = f"/public/{agent_name}"
+    fallback = None
 
-    # First, try to find exact match for /public/{agent_name}
+    # Single pass: return an exact /public/{agent_name} match immediately,
+    # otherwise remember the first address that looks like a SIP address
     for addr in addresses:
         audio_channel = addr.get("channels", {}).get("audio", "")
         if audio_channel == expected_address:
             return addr
-
-    # Fallback: find any address that looks like a SIP address (not a phone number)
-    for addr in addresses:
-        audio_channel = addr.get("channels", {}).get("audio", "")
-        # SIP addresses start with /public/ and don't contain phone number patterns
-        if audio_channel.startswith("/public/") and not any(c.isdigit() for c in audio_channel.split("/")[-1][:3]):
-            return addr
+        if fallback is None and _SIP_ADDRESS_RE.match(audio_channel):
+            fallback = addr
 
     # Last resort: return first address
-    return addresses[0] if addresses else None
+    return fallback or (addresses[0] if addresses else None)
+
+
+def fetch_handler_addresses(sw_host, auth, handler_id):
+    """
+    Fetch the addresses attached to an SWML handler.
+
+    Returns:
+        List of address dicts, or None if the request failed
+    """
+    addr_resp = _SW_SESSION.get(
+        f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{handler_id}/addresses",
+        auth=auth,
+        timeout=_SW_TIMEOUT
+    )
+    if addr_resp.status_code != 200:
+        return None
+    return orjson.loads(addr_resp.content).get("data", [])
 
 
 def find_existing_handler(sw_host, auth, agent_name):
@@ -207,44 +632,54 @@ def find_existing_handler(sw_host, auth, agent_name):
     """
     try:
         # List all external SWML handlers in the project
-        resp = requests.get(
+        resp = _SW_SESSION.get(
             f"https://{sw_host}/api/fabric/resources/external_swml_handlers",
             auth=auth,
-            headers={"Accept": "application/json"}
+            timeout=_SW_TIMEOUT
         )
         if resp.status_code != 200:
             logger.warning(f"Failed to list handlers: {resp.status_code}")
             return None
 
-        handlers = resp.json().get("data", [])
+        handlers = orjson.loads(resp.content).get("data", [])
 
+        # Collect handlers matching our agent name (normally just one)
+        candidates = []
         for handler in handlers:
             # The name is nested in the swml_webhook object
             swml_webhook = handler.get("swml_webhook", {})
             handler_name = swml_webhook.get("name") or handler.get("display_name")
 
-            # Check if this handler matches our agent name
             if handler_name == agent_name:
-                handler_id = handler.get("id")
-                handler_url = swml_webhook.get("primary_request_url", "")
-
-                # Get the address for this handler (needed for token scoping)
-                addr_resp = requests.get(
-                    f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{handler_id}/addresses",
-                    auth=auth,
-                    headers={"Accept": "application/json"}
-                )
-                if addr_resp.status_code == 200:
-                    addresses = addr_resp.json().get("data", [])
-                    resource_addr = find_resource_address(addresses, agent_name)
-                    if resource_addr:
-                        return {
-                            "id": handler_id,
-                            "name": handler_name,
-                            "url": handler_url,
-                            "address_id": resource_addr["id"],
-                            "address": resource_addr["channels"]["audio"]
-                        }
+                candidates.append((handler.get("id"), swml_webhook.get("primary_request_url", "")))
+
+        if not candidates:
+            return None
+
+        # Get the addresses for each candidate (needed for token scoping).
+        # Duplicates are fetched in parallel rather than one round-trip at a time.
+        handler_ids = [handler_id for handler_id, _ in candidates]
+        if len(handler_ids) == 1:
+            address_lists = [fetch_handler_addresses(sw_host, auth, handler_ids[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                address_lists = list(pool.map(
+                    lambda handler_id: fetch_handler_addresses(sw_host, auth, handler_id),
+                    handler_ids
+                ))
+
+        for (handler_id, handler_url), addresses in zip(candidates, address_lists):
+            if addresses is None:
+                continue
+            resource_addr = find_resource_address(addresses, agent_name)
+            if resource_addr:
+                return {
+                    "id": handler_id,
+                    "name": agent_name,
+                    "url": handler_url,
+                    "address_id": resource_addr["id"],
+                    "address": resource_addr["channels"]["audio"]
+                }
     except Exception as e:
         logger.error(f"Error finding existing handler: {e}")
     return None
@@ -268,9 +703,7 @@ def setup_swml_handler():
     2. APP_URL (auto-set by Dokku/Heroku)
     """
     # Get configuration from environment
-    sw_host = get_signalwire_host()
-    project = os.getenv("SIGNALWIRE_PROJECT_ID", "")
-    token = os.getenv("SIGNALWIRE_TOKEN", "")
+    sw_host = _SW_HOST
     agent_name = os.getenv("AGENT_NAME", "example")
 
     # URL priority: SWML_PROXY_URL_BASE > APP_URL (auto-set by Dokku/Heroku)
@@ -279,7 +712,7 @@ def setup_swml_handler():
     auth_pass = os.getenv("SWML_BASIC_AUTH_PASSWORD", "")
 
     # Validate required configuration
-    if not all([sw_host, project, token]):
+    if not _SW_AUTH:
         logger.warning("SignalWire credentials not configured - skipping SWML handler setup")
         return
 
@@ -295,27 +728,27 @@ def setup_swml_handler():
     else:
         swml_url = f"{proxy_url}/{agent_name}"
 
-    auth = (project, token)
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    auth = _SW_AUTH
+
+    # Request body shared by the update and create paths
+    handler_body = {
+        "primary_request_url": swml_url,
+        "primary_request_method": "POST"
+    }
 
     # Look for an existing handler by name
     existing = find_existing_handler(sw_host, auth, agent_name)
 
     if existing:
         # Handler exists - update the URL (credentials may have changed)
-        swml_handler_info["id"] = existing["id"]
-        swml_handler_info["address_id"] = existing["address_id"]
-        swml_handler_info["address"] = existing["address"]
+        _set_handler_info(HandlerInfo(existing["id"], existing["address_id"], existing["address"]))
 
         try:
-            update_resp = requests.put(
+            update_resp = _SW_SESSION.put(
                 f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{existing['id']}",
-                json={
-                    "primary_request_url": swml_url,
-                    "primary_request_method": "POST"
-                },
+                data=orjson.dumps(handler_body),
                 auth=auth,
-                headers=headers
+                timeout=_SW_TIMEOUT
             )
             update_resp.raise_for_status()
             logger.info(f"Updated SWML handler: {existing['name']}")
@@ -326,44 +759,38 @@ def setup_swml_handler():
     else:
         # Create a new external SWML handler
         try:
-            handler_resp = requests.post(
+            handler_resp = _SW_SESSION.post(
                 f"https://{sw_host}/api/fabric/resources/external_swml_handlers",
-                json={
-                    "name": agent_name,
-                    "used_for": "calling",
-                    "primary_request_url": swml_url,
-                    "primary_request_method": "POST"
-                },
+                data=orjson.dumps({"name": agent_name, "used_for": "calling", **handler_body}),
                 auth=auth,
-                headers=headers
+                timeout=_SW_TIMEOUT
             )
             handler_resp.raise_for_status()
-            handler_id = handler_resp.json().get("id")
-            swml_handler_info["id"] = handler_id
+            handler_id = orjson.loads(handler_resp.content).get("id")
+            info = HandlerInfo(id=handler_id)
 
             # Get the address for this handler
-            addr_resp = requests.get(
+            addr_resp = _SW_SESSION.get(
                 f"https://{sw_host}/api/fabric/resources/external_swml_handlers/{handler_id}/addresses",
                 auth=auth,
-                headers={"Accept": "application/json"}
+                timeout=_SW_TIMEOUT
             )
             addr_resp.raise_for_status()
-            addresses = addr_resp.json().get("data", [])
+            addresses = orjson.loads(addr_resp.content).get("data", [])
             resource_addr = find_resource_address(addresses, agent_name)
             if resource_addr:
-                swml_handler_info["address_id"] = resource_addr["id"]
-                swml_handler_info["address"] = resource_addr["channels"]["audio"]
+                info.address_id = resource_addr["id"]
+                info.address = resource_addr["channels"]["audio"]
+            _set_handler_info(info)
 
-            logger.info(f"Created SWML handler '{agent_name}' with address: {swml_handler_info.get('address')}")
+            logger.info(f"Created SWML handler '{agent_name}' with address: {info.address}")
         except Exception as e:
             logger.error(f"Failed to create SWML handler: {e}")
             # Retry finding existing handler (another worker may have just created it)
             time.sleep(0.5)
             existing = find_existing_handler(sw_host, auth, agent_name)
             if existing:
-                swml_handler_info["id"] = existing["id"]
-                swml_handler_info["address_id"] = existing["address_id"]
-                swml_handler_info["address"] = existing["address"]
+                _set_handler_info(HandlerInfo(existing["id"], existing["address_id"], existing["address"]))
                 logger.info(f"Found existing SWML handler after retry: {existing['name']}")
                 logger.info(f"Call address: {existing['address']}")
 
@@ -374,6 +801,206 @@ def setup_swml_handler():
 # The agent class defines the AI personality, conversation flow, and tools (SWAIG
 # functions) that the agent can use.
 
+# ─────────────────────────────────────────────────────────────────────────────
+# SWAIG Parameter Schemas
+# ─────────────────────────────────────────────────────────────────────────────
+# Built once at import and shared by every ReservationAgent instance.
+
+_SET_RESERVATION_NAME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {
+            "type": "string",
+            "description": "The name for the reservation"
+        }
+    },
+    "required": ["name"]
+}
+
+_SET_PARTY_SIZE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "party_size": {
+            "type": "integer",
+            "description": "Number of guests",
+            "minimum": 1,
+            "maximum": MAX_PARTY_SIZE
+        }
+    },
+    "required": ["party_size"]
+}
+
+_SET_RESERVATION_DATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "date": {
+            "type": "string",
+            "description": "The date in YYYY-MM-DD format (e.g., 2025-01-15). Convert 'tomorrow' to actual date."
+        }
+    },
+    "required": ["date"]
+}
+
+_SET_RESERVATION_TIME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "time": {
+            "type": "string",
+            "description": "The time slot in 24h format: 17:00, 18:00, 19:00, 20:00, or 21:00",
+            "enum": TIME_SLOTS
+        }
+    },
+    "required": ["time"]
+}
+
+_SET_PHONE_NUMBER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "phone": {
+            "type": "string",
+            "description": "The phone number for the reservation in e.164 format"
+        }
+    },
+    "required": ["phone"]
+}
+
+_SET_SPECIAL_REQUESTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "requests": {
+            "type": "string",
+            "description": "Special requests or notes. Use empty string if none."
+        }
+    },
+    "required": []
+}
+
+_CHECK_AVAILABILITY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "date": {
+            "type": "string",
+            "description": "The date to check (YYYY-MM-DD)"
+        },
+        "time": {
+            "type": "string",
+            "description": "The time slot to check (optional)",
+            "enum": TIME_SLOTS
+        }
+    },
+    "required": ["date"]
+}
+
+_LOOKUP_RESERVATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "phone": {
+            "type": "string",
+            "description": "Phone number to search (full number or its last four digits)"
+        },
+        "name": {
+            "type": "string",
+            "description": "Name to search"
+        }
+    },
+    "required": []
+}
+
+_MODIFY_RESERVATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "party_size": {"type": "integer", "description": "New party size"},
+        "date": {"type": "string", "description": "New date (YYYY-MM-DD)"},
+        "time": {"type": "string", "description": "New time slot", "enum": TIME_SLOTS},
+        "special_requests": {"type": "string", "description": "Updated special requests"}
+    },
+    "required": []
+}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Response Messages
+# ─────────────────────────────────────────────────────────────────────────────
+# Fixed responses, and templates for sentences shared by several tools.
+
+_MSG_START_RESERVATION = "Wonderful! Let's get you a table. May I have the name for the reservation?"
+_MSG_PARTY_TOO_LARGE = (
+    f"I'm sorry, we can only accommodate parties up to {MAX_PARTY_SIZE}. "
+    "For larger groups, please call us directly."
+)
+_MSG_INVALID_TIME = (
+    "I'm sorry, that's not a valid time slot. "
+    f"We have openings at: {_TIME_SLOTS_DISPLAY}."
+)
+_MSG_ASK_SPECIAL_REQUESTS = (
+    "Perfect! Any special requests or occasions we should know about? "
+    "For example, a birthday, anniversary, dietary restrictions, or seating preferences?"
+)
+_MSG_SLOT_TAKEN = "I'm sorry, that time slot was just taken. Let me check what else is available."
+_MSG_LOOKUP_PROMPT = "I can look up your reservation by phone number or name. Which would you like to provide?"
+_MSG_NOT_FOUND = (
+    "I couldn't find a reservation with that information. "
+    "Would you like to try different details or make a new reservation?"
+)
+_MSG_LOOKUP_FIRST = (
+    "I need to look up your reservation first. "
+    "Can you provide your phone number or name?"
+)
+_MSG_ANYTHING_ELSE = "No problem! Is there anything else I can help you with?"
+
+# "{name}, party of {party_size}, on {date} at {time}" - filled from a Reservation
+_TPL_RESERVATION = "{0.name}, party of {0.party_size}, on {0.date} at {0.time}"
+_TPL_CONFIRM_SUMMARY = (
+    "Let me confirm your reservation: "
+    "{name}, party of {party_size}, on {date} at {time}. Phone: {phone}."
+)
+_TPL_CONFIRMED = (
+    "Your reservation is confirmed! " + _TPL_RESERVATION + ". "
+    "Your confirmation number is {1}. We look forward to seeing you!"
+)
+_TPL_FOUND = (
+    "I found your reservation: " + _TPL_RESERVATION + ". "
+    "Would you like to modify or cancel this reservation?"
+)
+_TPL_MATCH_PREVIEW = "{0.name} on {0.date} at {0.time}"
+_TPL_MULTIPLE_FOUND = (
+    "I found multiple reservations: {0}. "
+    "Could you provide more details to help me find the right one?"
+)
+_TPL_UPDATED = "Your reservation has been updated: " + _TPL_RESERVATION + ". Is there anything else?"
+_TPL_DATE_FULL = "I'm sorry, we're fully booked on {date}. Would you like to try a different date?"
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Per-Call SWML Settings
+# ─────────────────────────────────────────────────────────────────────────────
+# Applied in on_swml_request for every inbound call. _HINTS must stay a list:
+# the SDK's add_hints() ignores any other sequence type.
+
+_HINTS = [
+    "Bobby's Table",
+    "reservation",
+    "party of",
+    "five PM", "six PM", "seven PM", "eight PM", "nine PM",
+    "17:00", "18:00", "19:00", "20:00", "21:00"
+]
+_LANGUAGE = {"name": "English", "code": "en-US", "voice": "elevenlabs.adam"}
+_POST_PROMPT = (
+    "Summarize the reservation call including: "
+    "whether a reservation was made, modified, or cancelled; "
+    "the guest name, party size, date and time if applicable; "
+    "and any special requests mentioned."
+)
+
+# Shared empty mapping for missing raw_data; read-only, never mutate it
+_EMPTY = {}
+
+
+def _unpack_pending(raw_data):
+    """Return (global_data, pending_reservation) from a SWAIG request's raw_data."""
+    global_data = (raw_data or _EMPTY).get("global_data") or {}
+    pending = global_data.get("pending_reservation") or {}
+    return global_data, pending
+
+
 class ReservationAgent(AgentBase):
     """
     Bobby's Table - Restaurant Reservation Agent.
@@ -391,6 +1018,7 @@ class ReservationAgent(AgentBase):
 
         self._setup_prompts()
         self._setup_contexts()
+        self._setup_static_results()
         self._setup_functions()
 
     def _setup_prompts(self):
@@ -422,8 +1050,7 @@ class ReservationAgent(AgentBase):
 
         self.prompt_add_section(
             "Time Slots",
-            f"Available time slots are: {', '.join(TIME_SLOTS)} (5 PM to 9 PM). "
-            f"Maximum party size is {MAX_PARTY_SIZE}."
+            _TIME_SLOTS_PROMPT
         )
 
     def _setup_contexts(self):
@@ -480,6 +1107,28 @@ class ReservationAgent(AgentBase):
             .set_text("I found your reservation. Would you like to modify or cancel it?") \
             .set_functions(["modify_reservation", "cancel_existing_reservation", "cancel_flow"])
 
+    def _setup_static_results(self):
+        """Build the fixed tool responses once; tools return these shared instances."""
+        self._start_reservation_result = (
+            SwaigFunctionResult(_MSG_START_RESERVATION)
+            .swml_change_context("new_reservation")
+            .update_global_data({"pending_reservation": {}})
+        )
+        self._cancel_flow_result = (
+            SwaigFunctionResult(_MSG_ANYTHING_ELSE)
+            .swml_change_context("greeting")
+            .update_global_data({"pending_reservation": {}, "found_reservation_id": None})
+        )
+        self._lookup_prompt_result = (
+            SwaigFunctionResult(_MSG_LOOKUP_PROMPT)
+            .swml_change_context("manage")
+        )
+        self._lookup_first_result = SwaigFunctionResult(_MSG_LOOKUP_FIRST)
+        self._not_found_result = SwaigFunctionResult(_MSG_NOT_FOUND)
+        self._slot_taken_result = SwaigFunctionResult(_MSG_SLOT_TAKEN)
+        self._invalid_time_result = SwaigFunctionResult(_MSG_INVALID_TIME)
+        self._party_too_large_result = SwaigFunctionResult(_MSG_PARTY_TOO_LARGE)
+
     def _setup_functions(self):
         """Define SWAIG functions for reservation workflow."""
 
@@ -491,11 +1140,7 @@ class ReservationAgent(AgentBase):
             description="Start making a new reservation. Use when customer wants to book a table. After this, collect: name, party size, date, time, phone, then special requests."
         )
         def start_new_reservation(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            return (
-                SwaigFunctionResult("Wonderful! Let's get you a table. May I have the name for the reservation?")
-                .swml_change_context("new_reservation")
-                .update_global_data({"pending_reservation": {}})
-            )
+            return self._start_reservation_result
 
         # ─────────────────────────────────────────────────────────────────────
         # Set Reservation Name
@@ -503,22 +1148,11 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_reservation_name",
             description="Record the guest's name for the reservation. After setting name, ask for party size.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "The name for the reservation"
-                    }
-                },
-                "required": ["name"]
-            }
+            parameters=_SET_RESERVATION_NAME_SCHEMA
         )
         def set_reservation_name(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            name = args.get("name", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            name = args["name"]
+            global_data, pending = _unpack_pending(raw_data)
 
             pending["name"] = name
             global_data["pending_reservation"] = pending
@@ -534,30 +1168,14 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_party_size",
             description="Record the number of guests for the reservation. After setting party size, ask for date.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "party_size": {
-                        "type": "integer",
-                        "description": "Number of guests",
-                        "minimum": 1,
-                        "maximum": MAX_PARTY_SIZE
-                    }
-                },
-                "required": ["party_size"]
-            }
+            parameters=_SET_PARTY_SIZE_SCHEMA
         )
         def set_party_size(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            party_size = args.get("party_size", 2)
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            party_size = args["party_size"]
+            global_data, pending = _unpack_pending(raw_data)
 
             if party_size > MAX_PARTY_SIZE:
-                return SwaigFunctionResult(
-                    f"I'm sorry, we can only accommodate parties up to {MAX_PARTY_SIZE}. "
-                    "For larger groups, please call us directly."
-                )
+                return self._party_too_large_result
 
             pending["party_size"] = party_size
             global_data["pending_reservation"] = pending
@@ -573,38 +1191,21 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_reservation_date",
             description="Record the date for the reservation. Convert natural language like 'tomorrow', 'next Friday', 'January 5th' to YYYY-MM-DD format before calling. After setting date, ask for time.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "date": {
-                        "type": "string",
-                        "description": "The date in YYYY-MM-DD format (e.g., 2025-01-15). Convert 'tomorrow' to actual date."
-                    }
-                },
-                "required": ["date"]
-            }
+            parameters=_SET_RESERVATION_DATE_SCHEMA
         )
         def set_reservation_date(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            date = args.get("date", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            date = args["date"]
+            global_data, pending = _unpack_pending(raw_data)
 
             pending["date"] = date
             global_data["pending_reservation"] = pending
 
             # Check overall availability for the date
-            available_slots = []
-            for slot in TIME_SLOTS:
-                avail = get_slot_availability(date, slot)
-                if avail["available"]:
-                    available_slots.append(slot)
+            available_slots = [slot for slot in TIME_SLOTS if _slot_has_room(date, slot)]
 
             if not available_slots:
                 return (
-                    SwaigFunctionResult(
-                        f"I'm sorry, we're fully booked on {date}. Would you like to try a different date?"
-                    )
+                    SwaigFunctionResult(_TPL_DATE_FULL.format(date=date))
                     .update_global_data(global_data)
                 )
 
@@ -623,44 +1224,27 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_reservation_time",
             description="Record the time slot for the reservation. Convert '7pm' to '19:00' format. After setting time, ask for phone number.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "time": {
-                        "type": "string",
-                        "description": "The time slot in 24h format: 17:00, 18:00, 19:00, 20:00, or 21:00",
-                        "enum": TIME_SLOTS
-                    }
-                },
-                "required": ["time"]
-            }
+            parameters=_SET_RESERVATION_TIME_SCHEMA
         )
         def set_reservation_time(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            time_slot = args.get("time", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            time_slot = args["time"]
+            global_data, pending = _unpack_pending(raw_data)
             date = pending.get("date", "")
 
-            if time_slot not in TIME_SLOTS:
-                return SwaigFunctionResult(
-                    f"I'm sorry, that's not a valid time slot. "
-                    f"We have openings at: {', '.join(TIME_SLOTS)}."
-                )
+            if time_slot not in TIME_SLOTS_SET:
+                return self._invalid_time_result
 
             avail = get_slot_availability(date, time_slot)
-            if not avail["available"]:
+            if not avail.available:
                 # Find alternative times
-                alternatives = [s for s in TIME_SLOTS if get_slot_availability(date, s)["available"]]
+                alternatives = [s for s in TIME_SLOTS if _slot_has_room(date, s)]
                 if alternatives:
                     return SwaigFunctionResult(
                         f"I'm sorry, {time_slot} is fully booked. "
                         f"We have availability at: {', '.join(alternatives)}. Would you like one of those?"
                     )
                 else:
-                    return SwaigFunctionResult(
-                        f"I'm sorry, we're fully booked on {date}. Would you like to try a different date?"
-                    )
+                    return SwaigFunctionResult(_TPL_DATE_FULL.format(date=date))
 
             pending["time"] = time_slot
             global_data["pending_reservation"] = pending
@@ -676,31 +1260,17 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_phone_number",
             description="Record the phone number for the reservation. After setting phone, ask about special requests.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "phone": {
-                        "type": "string",
-                        "description": "The phone number for the reservation in e.164 format"
-                    }
-                },
-                "required": ["phone"]
-            }
+            parameters=_SET_PHONE_NUMBER_SCHEMA
         )
         def set_phone_number(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            phone = args.get("phone", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            phone = args["phone"]
+            global_data, pending = _unpack_pending(raw_data)
 
             pending["phone"] = phone
             global_data["pending_reservation"] = pending
 
             return (
-                SwaigFunctionResult(
-                    "Perfect! Any special requests or occasions we should know about? "
-                    "For example, a birthday, anniversary, dietary restrictions, or seating preferences?"
-                )
+                SwaigFunctionResult(_MSG_ASK_SPECIAL_REQUESTS)
                 .update_global_data(global_data)
             )
 
@@ -710,22 +1280,11 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="set_special_requests",
             description="Record any special requests for the reservation. Call this even if customer says 'none' or 'no'. This completes the collection and shows confirmation.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "requests": {
-                        "type": "string",
-                        "description": "Special requests or notes. Use empty string if none."
-                    }
-                },
-                "required": []
-            }
+            parameters=_SET_SPECIAL_REQUESTS_SCHEMA
         )
         def set_special_requests(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
             requests = args.get("requests", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            global_data, pending = _unpack_pending(raw_data)
 
             pending["special_requests"] = requests if requests else ""
             global_data["pending_reservation"] = pending
@@ -737,14 +1296,13 @@ class ReservationAgent(AgentBase):
             time_slot = pending.get("time", "")
             phone = pending.get("phone", "")
 
-            summary = (
-                f"Let me confirm your reservation: "
-                f"{name}, party of {party_size}, on {date} at {time_slot}. "
-                f"Phone: {phone}."
-            )
+            parts = [_TPL_CONFIRM_SUMMARY.format(
+                name=name, party_size=party_size, date=date, time=time_slot, phone=phone
+            )]
             if requests:
-                summary += f" Special requests: {requests}."
-            summary += " Is this correct?"
+                parts.append(f" Special requests: {requests}.")
+            parts.append(" Is this correct?")
+            summary = "".join(parts)
 
             return (
                 SwaigFunctionResult(summary)
@@ -758,42 +1316,36 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="check_availability",
             description="Check availability for a specific date and time.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "date": {
-                        "type": "string",
-                        "description": "The date to check (YYYY-MM-DD)"
-                    },
-                    "time": {
-                        "type": "string",
-                        "description": "The time slot to check (optional)",
-                        "enum": TIME_SLOTS
-                    }
-                },
-                "required": ["date"]
-            }
+            parameters=_CHECK_AVAILABILITY_SCHEMA
         )
         def check_availability(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            date = args.get("date", "")
+            date = args["date"]
             time_slot = args.get("time")
 
+            if time_slot and time_slot not in TIME_SLOTS_SET:
+                return self._invalid_time_result
+
             if time_slot:
                 avail = get_slot_availability(date, time_slot)
-                if avail["available"]:
+                if avail.available:
                     return SwaigFunctionResult(
-                        f"Yes, {time_slot} on {date} is available with {avail['remaining']} spots remaining."
+                        f"Yes, {time_slot} on {date} is available with {avail.remaining} spots remaining."
                     )
                 else:
                     return SwaigFunctionResult(
                         f"I'm sorry, {time_slot} on {date} is fully booked."
                     )
             else:
-                available_slots = []
-                for slot in TIME_SLOTS:
-                    avail = get_slot_availability(date, slot)
-                    if avail["available"]:
-                        available_slots.append(f"{slot} ({avail['remaining']} spots)")
+                # Read the date's row once and walk it locally
+                row = _booked_row(date)
+                if row is None:
+                    available_slots = [f"{slot} ({MAX_PER_SLOT} spots)" for slot in TIME_SLOTS]
+                else:
+                    available_slots = [
+                        f"{slot} ({MAX_PER_SLOT - booked} spots)"
+                        for slot, booked in zip(TIME_SLOTS, row)
+                        if booked < MAX_PER_SLOT
+                    ]
 
                 if available_slots:
                     return SwaigFunctionResult(
@@ -812,42 +1364,40 @@ class ReservationAgent(AgentBase):
             description="Finalize and confirm the reservation."
         )
         def confirm_reservation(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
-            pending = global_data.get("pending_reservation", {})
+            global_data, pending = _unpack_pending(raw_data)
 
-            # Validate required fields
-            required = ["name", "party_size", "date", "time", "phone"]
-            missing = [f for f in required if not pending.get(f)]
-            if missing:
+            # Validate required fields (no list is built unless something is missing)
+            required = ("name", "party_size", "date", "time", "phone")
+            if not all(pending.get(f) for f in required):
+                missing = [f for f in required if not pending.get(f)]
                 return SwaigFunctionResult(
                     f"I'm missing some information: {', '.join(missing)}. Let's go back and complete those."
                 )
 
             # Check availability one more time
             avail = get_slot_availability(pending["date"], pending["time"])
-            if not avail["available"]:
-                return SwaigFunctionResult(
-                    "I'm sorry, that time slot was just taken. Let me check what else is available."
-                )
+            if not avail.available:
+                return self._slot_taken_result
 
             # Create the reservation
             confirmation_number = generate_confirmation_number()
-            reservation = {
-                "id": confirmation_number,
-                "name": pending["name"],
-                "party_size": pending["party_size"],
-                "date": pending["date"],
-                "time": pending["time"],
-                "phone": pending["phone"],
-                "special_requests": pending.get("special_requests", ""),
-                "created_at": datetime.utcnow().isoformat(),
-                "status": "confirmed"
-            }
+            reservation = Reservation(
+                id=confirmation_number,
+                name=pending["name"],
+                party_size=pending["party_size"],
+                date=pending["date"],
+                time=pending["time"],
+                phone=pending["phone"],
+                special_requests=pending.get("special_requests", ""),
+                created_at=time.strftime(_ISO_UTC, time.gmtime())
+            )
 
-            # Book the slot and save reservation
-            book_slot(pending["date"], pending["time"], confirmation_number)
+            # Book the slot (another call may have taken it since the check above)
+            if not book_slot(pending["date"], pending["time"], confirmation_number):
+                return self._slot_taken_result
             RESERVATIONS[confirmation_number] = reservation
+            CONFIRMED_RESERVATIONS[confirmation_number] = reservation
+            _index_reservation(reservation)
 
             # Clear pending reservation
             global_data["pending_reservation"] = {}
@@ -855,18 +1405,13 @@ class ReservationAgent(AgentBase):
 
             # Use say_digits for TTS-friendly pronunciation
             spoken_number = say_digits(confirmation_number)
-            result = SwaigFunctionResult(
-                f"Your reservation is confirmed! "
-                f"{pending['name']}, party of {pending['party_size']}, "
-                f"on {pending['date']} at {pending['time']}. "
-                f"Your confirmation number is {spoken_number}. We look forward to seeing you!"
-            )
+            result = SwaigFunctionResult(_TPL_CONFIRMED.format(reservation, spoken_number))
             result.update_global_data(global_data)
 
             # Send event to frontend
             result.swml_user_event({
                 "type": "reservation_confirmed",
-                "reservation": reservation
+                "reservation": asdict(reservation)
             })
 
             return result
@@ -877,73 +1422,35 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="lookup_reservation",
             description="Look up an existing reservation by phone number or name.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "phone": {
-                        "type": "string",
-                        "description": "Phone number to search"
-                    },
-                    "name": {
-                        "type": "string",
-                        "description": "Name to search"
-                    }
-                },
-                "required": []
-            }
+            parameters=_LOOKUP_RESERVATION_SCHEMA
         )
         def lookup_reservation(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            phone = args.get("phone", "")
-            name = args.get("name", "")
-            raw_data = raw_data or {}
-            global_data = raw_data.get("global_data", {})
+            phone = args.get("phone") or ""
+            name = args.get("name") or ""
 
             if not phone and not name:
-                return (
-                    SwaigFunctionResult(
-                        "I can look up your reservation by phone number or name. Which would you like to provide?"
-                    )
-                    .swml_change_context("manage")
-                )
+                return self._lookup_prompt_result
 
             # Search for matching reservations
-            matches = []
-            for res_id, res in RESERVATIONS.items():
-                if res["status"] != "confirmed":
-                    continue
-                if phone and phone in res.get("phone", ""):
-                    matches.append(res)
-                elif name and name.lower() in res.get("name", "").lower():
-                    matches.append(res)
+            matches = find_reservations(phone, name)
 
             if not matches:
-                return SwaigFunctionResult(
-                    "I couldn't find a reservation with that information. "
-                    "Would you like to try different details or make a new reservation?"
-                )
+                return self._not_found_result
 
             if len(matches) == 1:
                 res = matches[0]
-                global_data["found_reservation_id"] = res["id"]
+                raw_data = raw_data or {}
+                global_data = raw_data.get("global_data", {})
+                global_data["found_reservation_id"] = res.id
                 return (
-                    SwaigFunctionResult(
-                        f"I found your reservation: {res['name']}, party of {res['party_size']}, "
-                        f"on {res['date']} at {res['time']}. "
-                        "Would you like to modify or cancel this reservation?"
-                    )
+                    SwaigFunctionResult(_TPL_FOUND.format(res))
                     .swml_change_context("manage")
                     .update_global_data(global_data)
                 )
 
-            # Multiple matches
-            res_list = "; ".join(
-                f"{r['name']} on {r['date']} at {r['time']}"
-                for r in matches[:3]
-            )
-            return SwaigFunctionResult(
-                f"I found multiple reservations: {res_list}. "
-                "Could you provide more details to help me find the right one?"
-            )
+            # Multiple matches: preview only the first three
+            res_list = "; ".join(map(_TPL_MATCH_PREVIEW.format, matches[:3]))
+            return SwaigFunctionResult(_TPL_MULTIPLE_FOUND.format(res_list))
 
         # ─────────────────────────────────────────────────────────────────────
         # Modify Reservation
@@ -951,62 +1458,66 @@ class ReservationAgent(AgentBase):
         @self.tool(
             name="modify_reservation",
             description="Modify an existing reservation.",
-            parameters={
-                "type": "object",
-                "properties": {
-                    "party_size": {"type": "integer", "description": "New party size"},
-                    "date": {"type": "string", "description": "New date (YYYY-MM-DD)"},
-                    "time": {"type": "string", "description": "New time slot", "enum": TIME_SLOTS},
-                    "special_requests": {"type": "string", "description": "Updated special requests"}
-                },
-                "required": []
-            }
+            parameters=_MODIFY_RESERVATION_SCHEMA
         )
         def modify_reservation(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
             raw_data = raw_data or {}
             global_data = raw_data.get("global_data", {})
             res_id = global_data.get("found_reservation_id")
 
-            if not res_id or res_id not in RESERVATIONS:
-                return SwaigFunctionResult(
-                    "I need to look up your reservation first. "
-                    "Can you provide your phone number or name?"
-                )
+            res = CONFIRMED_RESERVATIONS.get(res_id) if res_id else None
+            if res is None:
+                return self._lookup_first_result
 
-            res = RESERVATIONS[res_id]
-            old_date = res["date"]
-            old_time = res["time"]
+            old_date = res.date
+            old_time = res.time
 
             # Check if date/time is changing
-            new_date = args.get("date", old_date)
-            new_time = args.get("time", old_time)
+            new_date = args.get("date") or old_date
+            new_time = args.get("time") or old_time
+
+            if new_time not in TIME_SLOTS_SET:
+                return self._invalid_time_result
 
             if new_date != old_date or new_time != old_time:
                 # Check new slot availability
                 avail = get_slot_availability(new_date, new_time)
-                if not avail["available"]:
+                if not avail.available:
+                    return SwaigFunctionResult(
+                        f"I'm sorry, {new_time} on {new_date} is not available. "
+                        "Would you like to try a different time?"
+                    )
+                # Take the new seat before giving back the old one, so the
+                # reservation keeps its old seat if the new slot filled up
+                # in the meantime and never ends up without a counted seat
+                old_slot = RES_TO_SLOT.get(res_id)
+                if not book_slot(new_date, new_time, res_id):
                     return SwaigFunctionResult(
                         f"I'm sorry, {new_time} on {new_date} is not available. "
                         "Would you like to try a different time?"
                     )
-                # Release old slot and book new
-                release_slot(old_date, old_time, res_id)
-                book_slot(new_date, new_time, res_id)
-                res["date"] = new_date
-                res["time"] = new_time
+                # The new seat is held, so commit the move before anything
+                # else can fail, then give the old seat back last. A failed
+                # return only leaks that seat; it must not undo the move.
+                _unindex_reservation(res)
+                res.date = new_date
+                res.time = new_time
+                _index_reservation(res)
+                if old_slot is not None:
+                    try:
+                        _return_seat(*old_slot)
+                    except Exception as e:
+                        logger.error(f"Failed to release old slot for reservation {res_id}: {e}")
 
             if "party_size" in args:
-                res["party_size"] = args["party_size"]
+                res.party_size = args["party_size"]
             if "special_requests" in args:
-                res["special_requests"] = args["special_requests"]
+                res.special_requests = args["special_requests"]
 
-            result = SwaigFunctionResult(
-                f"Your reservation has been updated: {res['name']}, party of {res['party_size']}, "
-                f"on {res['date']} at {res['time']}. Is there anything else?"
-            )
+            result = SwaigFunctionResult(_TPL_UPDATED.format(res))
             result.swml_user_event({
                 "type": "reservation_modified",
-                "reservation": res
+                "reservation": asdict(res)
             })
             return result
 
@@ -1022,20 +1533,21 @@ class ReservationAgent(AgentBase):
             global_data = raw_data.get("global_data", {})
             res_id = global_data.get("found_reservation_id")
 
-            if not res_id or res_id not in RESERVATIONS:
-                return SwaigFunctionResult(
-                    "I need to look up your reservation first. "
-                    "Can you provide your phone number or name?"
-                )
+            res = CONFIRMED_RESERVATIONS.get(res_id) if res_id else None
+            if res is None:
+                return self._lookup_first_result
 
-            res = RESERVATIONS[res_id]
-            res["status"] = "cancelled"
-            release_slot(res["date"], res["time"], res_id)
+            # Free the seat first: if that fails the reservation is left
+            # fully intact and the cancel can be retried
+            release_slot(res_id)
+            res.status = "cancelled"
+            CONFIRMED_RESERVATIONS.pop(res_id, None)
+            _unindex_reservation(res)
 
             global_data["found_reservation_id"] = None
 
             result = SwaigFunctionResult(
-                f"Your reservation for {res['name']} on {res['date']} at {res['time']} "
+                f"Your reservation for {res.name} on {res.date} at {res.time} "
                 "has been cancelled. Is there anything else I can help with?"
             )
             result.update_global_data(global_data)
@@ -1054,13 +1566,7 @@ class ReservationAgent(AgentBase):
             description="Cancel the current action and return to the main menu."
         )
         def cancel_flow(args: dict, raw_data: dict = None) -> SwaigFunctionResult:
-            return (
-                SwaigFunctionResult(
-                    "No problem! Is there anything else I can help you with?"
-                )
-                .swml_change_context("greeting")
-                .update_global_data({"pending_reservation": {}, "found_reservation_id": None})
-            )
+            return self._cancel_flow_result
 
     def on_swml_request(self, request_data, callback_path, request=None):
         """Configure dynamic settings for each request."""
@@ -1075,27 +1581,12 @@ class ReservationAgent(AgentBase):
         # Optional post-prompt URL from environment
         post_prompt_url = os.environ.get("POST_PROMPT_URL")
         if post_prompt_url:
-            self.set_post_prompt(
-                "Summarize the reservation call including: "
-                "whether a reservation was made, modified, or cancelled; "
-                "the guest name, party size, date and time if applicable; "
-                "and any special requests mentioned."
-            )
+            self.set_post_prompt(_POST_PROMPT)
             self.set_post_prompt_url(post_prompt_url)
 
-        self.add_language(
-            name="English",
-            code="en-US",
-            voice="elevenlabs.adam"
-        )
+        self.add_language(**_LANGUAGE)
 
-        self.add_hints([
-            "Bobby's Table",
-            "reservation",
-            "party of",
-            "five PM", "six PM", "seven PM", "eight PM", "nine PM",
-            "17:00", "18:00", "19:00", "20:00", "21:00"
-        ])
+        self.add_hints(_HINTS)
 
         return super().on_swml_request(request_data, callback_path, request)
 
@@ -1144,65 +1635,80 @@ def create_server(port=None):
     @server.app.get("/ready")
     def ready_check():
         """Readiness check - verifies SWML handler is configured."""
-        if swml_handler_info.get("address"):
-            return {"status": "ready", "address": swml_handler_info["address"]}
+        info = swml_handler_info
+        if info.address:
+            return {"status": "ready", "address": info.address}
         return {"status": "initializing"}
 
     # ─────────────────────────────────────────────────────────────────────────
     # Token Generation Endpoint
     # This is how web clients get authentication tokens for WebRTC calls
     # ─────────────────────────────────────────────────────────────────────────
+    @server.app.on_event("shutdown")
+    async def close_http_client():
+        """Close pooled connections held by the async SignalWire client."""
+        await _HTTPX.aclose()
+
     @server.app.get("/get_token")
-    def get_token():
+    async def get_token():
         """
         Generate a guest token for the web client.
 
         This endpoint:
         1. Validates SignalWire credentials are configured
         2. Verifies SWML handler is registered
-        3. Creates a scoped guest token via SignalWire API
+        3. Creates a scoped guest token via SignalWire API, or reuses the
+           cached one until it is within an hour of expiring
         4. Returns token and destination address
 
         The frontend uses this to initialize the SignalWire client and dial.
         """
-        sw_host = get_signalwire_host()
-        project = os.getenv("SIGNALWIRE_PROJECT_ID", "")
-        token = os.getenv("SIGNALWIRE_TOKEN", "")
-
         # Validate configuration
-        if not all([sw_host, project, token]):
-            return {"error": "SignalWire credentials not configured"}, 500
-
-        if not swml_handler_info.get("address_id"):
-            return {"error": "SWML handler not configured yet"}, 500
-
-        auth = (project, token)
-
-        try:
-            # Create guest token with 24-hour expiry
-            # Token is scoped to only allow calling our specific address
-            expire_at = int(time.time()) + 3600 * 24  # 24 hours
-
-            guest_resp = requests.post(
-                f"https://{sw_host}/api/fabric/guests/tokens",
-                json={
-                    "allowed_addresses": [swml_handler_info["address_id"]],
-                    "expire_at": expire_at
-                },
-                auth=auth,
-                headers={"Content-Type": "application/json", "Accept": "application/json"}
-            )
-            guest_resp.raise_for_status()
-            guest_token = guest_resp.json().get("token", "")
-
-            # Return token and the address to dial
-            return {
-                "token": guest_token,
-                "address": swml_handler_info["address"]
-            }
-        except Exception as e:
-            logger.error(f"Token request failed: {e}")
-            return {"error": str(e)}, 500
+        if not _SW_AUTH:
+            return _ERR_NO_CREDENTIALS
+
+        info = swml_handler_info
+        if not info.address_id:
+            return _ERR_NO_HANDLER
+
+        # Reuse the current guest token while it's fresh
+        guest_token = _cached_guest_token(info.address_id)
+        if guest_token:
+            return {"token": guest_token, "address": info.address}
+
+        async with _token_lock:
+            # Another request may have refreshed the token while we waited
+            guest_token = _cached_guest_token(info.address_id)
+            if guest_token:
+                return {"token": guest_token, "address": info.address}
+
+            try:
+                # Create guest token with 24-hour expiry
+                # Token is scoped to only allow calling our specific address
+                expire_at = int(time.time()) + 3600 * 24  # 24 hours
+
+                guest_resp = await _HTTPX.post(
+                    f"https://{_SW_HOST}/api/fabric/guests/tokens",
+                    content=orjson.dumps({
+                        "allowed_addresses": [info.address_id],
+                        "expire_at": expire_at
+                    }),
+                    auth=_SW_AUTH,
+                    timeout=_SW_TIMEOUT
+                )
+                guest_resp.raise_for_status()
+                guest_token = orjson.loads(guest_resp.content).get("token", "")
+                if guest_token:
+                    _store_guest_token(guest_token, expire_at, info.address_id)
+
+                # Return token and the address to dial
+                return {
+                    "token": guest_token,
+                    "address": info.address
+                }
+            except Exception as e:
+                logger.error(f"Token request failed: {e}")
+                return {"error": str(e)}, 500
 
     # ─────────────────────────────────────────────────────────────────────────
     # Debug Endpoint (optional - remove in production if desired)
@@ -1210,7 +1716,7 @@ def create_server(port=None):
     @server.app.get("/get_resource_info")
     def get_resource_info():
         """Return SWML handler info for debugging."""
-        return swml_handler_info
+        return asdict(swml_handler_info)
 
     # ─────────────────────────────────────────────────────────────────────────
     # Config Endpoint
@@ -1230,43 +1736,45 @@ def create_server(port=None):
     @server.app.get("/api/reservations")
     def get_reservations():
         """Return all reservations grouped by date, sorted by time."""
+        # RES_BY_DATE holds only confirmed reservations, already sorted by
+        # time; build the response directly in date order. items() is
+        # snapshotted up front, so a cancel dropping a date's bucket
+        # mid-loop can't raise KeyError
         grouped = {}
-        for res_id, res in RESERVATIONS.items():
-            if res["status"] == "confirmed":
-                date = res["date"]
-                if date not in grouped:
-                    grouped[date] = []
-                grouped[date].append(res)
-
-        # Sort each date's reservations by time
-        for date in grouped:
-            grouped[date].sort(key=lambda x: x["time"])
-
-        # Sort dates
-        sorted_grouped = dict(sorted(grouped.items()))
+        total = 0
+        for date, day in sorted(RES_BY_DATE.items()):
+            grouped[date] = [asdict(res) for res in day]
+            total += len(day)
 
         return {
-            "reservations": sorted_grouped,
-            "total_count": sum(len(v) for v in grouped.values())
+            "reservations": grouped,
+            "total_count": total
         }
 
     @server.app.get("/api/availability/{date}")
     def get_availability(date: str):
         """Return availability for all time slots on a date."""
-        if date not in AVAILABILITY:
-            # Initialize if not exists
-            return {
-                slot: {"available": MAX_PER_SLOT, "total": MAX_PER_SLOT}
-                for slot in TIME_SLOTS
-            }
-
-        return {
+        # Read the generation before the row: a booking in between bumps it,
+        # so the payload built below can't be reused once it's stale
+        gen = _AVAIL_GEN.get(date)
+        row = _booked_row(date)
+        if row is None:
+            return DEFAULT_AVAILABILITY
+
+        cached = _AVAIL_CACHE.get(date)
+        if cached is not None and cached[0] == gen and cached[1] is row:
+            return cached[2]
+
+        payload = {
             slot: {
-                "available": data["max"] - data["booked"],
-                "total": data["max"]
+                "available": MAX_PER_SLOT - row[i],
+                "total": MAX_PER_SLOT
             }
-            for slot, data in AVAILABILITY[date].items()
+            for i, slot in enumerate(TIME_SLOTS)
         }
+        if _AVAIL_GEN.get(date) == gen:
+            _AVAIL_CACHE[date] = (gen, row, payload)
+        return payload
 
     # ─────────────────────────────────────────────────────────────────────────
     # Startup: Register SWML handler